@@ -1,16 +1,21 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import copy
+import io
 import json
+import orjson
 import os
 import re
-from urllib.parse import urlparse
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import altair as alt
+import hashlib
+from pathlib import Path
 import streamlit.components.v1 as components
-from datetime import datetime
+from datetime import date, datetime
 
 # Set page configuration
 st.set_page_config(
@@ -44,22 +49,71 @@ st.markdown("""
 # File to store settings
 SETTINGS_FILE = "c4_analytics_settings.json"
 
+# Default persisted settings (the GitLab token is never persisted)
+_DEFAULT_SETTINGS = {
+    "project_id": "67327904",
+    "file_path": "symplaC4.json",
+    "branch": "main",
+    "selected_links": ["repository", "logs", "APM", "openAPI", "monitor", "dashboard"]
+}
+
+# Default values for every session state variable
+_SESSION_DEFAULTS = {
+    'gitlab_token': "",
+    **_DEFAULT_SETTINGS,
+    'mapped_elements': [],
+    'elements_table': None,
+    'link_presence': None,
+    'c4_json': None,
+    'csv_data': None,
+    'critical_repos': []
+}
+
+# Host + path of a repository URL, ignoring the scheme, query string and fragment
+_URL_RE = re.compile(r'^(?:https?://)?([^/?#]+(?:/[^?#]*)?)', re.IGNORECASE)
+
+# Element kinds mapped from the C4 data (GitLab fetches also include Symfony apps)
+_TARGET_KINDS = frozenset({'container', 'application', 'service', 'webapp', 'mobile'})
+_GITLAB_TARGET_KINDS = _TARGET_KINDS | {'symfony-app'}
+
+# Set C4_FORCE_MATCH_RECOMPUTE=1 to always recompute repository matches (debugging aid)
+FORCE_MATCH_RECOMPUTE = os.environ.get("C4_FORCE_MATCH_RECOMPUTE") == "1"
+
+# Progress status values of the critical repositories
+STATUS_CATEGORIES = ['Complete', 'Incomplete', 'Not mapped']
+
+# Status values with visual indicators, as shown in the repository details table
+STATUS_LABELS = {'Complete': '✅ Complete', 'Incomplete': '⚠️ Incomplete', 'Not mapped': '❌ Not mapped'}
+
+# Maximum number of rows rendered at once in paginated tables
+DATAFRAME_PAGE_SIZE = 200
+
+# Column added to the uploaded CSV holding its normalized repository URLs
+NORMALIZED_URL_COLUMN = '_normalized_url'
+
+# Link types tracked in the mapped elements grid and offered for progress evaluation
+LINK_TYPES = ['repository', 'logs', 'APM', 'openAPI', 'monitor', 'monitoring', 'dashboard', 'backstage']
+
+# One bit per link type, so an element's links pack into a single uint8
+LINK_BITS = {link_type: 1 << i for i, link_type in enumerate(LINK_TYPES)}
+
+# Link types shown as grid filters and columns ("monitoring" is shown as part of "monitor")
+GRID_LINK_TYPES = [link_type for link_type in LINK_TYPES if link_type != 'monitoring']
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _load_settings_cached(path, mtime):
+    """Read and parse the settings file; the mtime argument invalidates stale entries"""
+    return orjson.loads(Path(path).read_bytes())
+
 def load_settings():
     """Load saved settings from file if it exists"""
     if os.path.exists(SETTINGS_FILE):
         try:
-            with open(SETTINGS_FILE, 'r') as f:
-                settings = json.load(f)
-                return settings
+            return _load_settings_cached(SETTINGS_FILE, os.path.getmtime(SETTINGS_FILE))
         except Exception as e:
             st.error(f"Error loading settings: {e}")
     # Default values without token
-    return {
-        "project_id": "67327904",
-        "file_path": "symplaC4.json",
-        "branch": "main",
-        "selected_links": ["repository", "logs", "APM", "openAPI", "monitor", "dashboard"]
-    }
+    return copy.deepcopy(_DEFAULT_SETTINGS)
 
 def save_settings(project_id, file_path, branch, selected_links):
     """Save current settings to file"""
@@ -71,13 +125,39 @@ def save_settings(project_id, file_path, branch, selected_links):
         "last_saved": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
     try:
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(settings, f)
+        with open(SETTINGS_FILE, 'wb') as f:
+            f.write(orjson.dumps(settings))
         return True
     except Exception as e:
         st.error(f"Error saving settings: {e}")
         return False
 
+# Script that stores settings in the browser's localStorage. Values are injected as a
+# JSON literal rather than interpolated into the script source.
+_SAVE_SETTINGS_JS = """
+<script>
+    try {
+        const settings = __SETTINGS_JSON__;
+        localStorage.setItem('c4_analytics_settings', JSON.stringify(settings));
+        console.log('Settings saved successfully');
+    } catch (e) {
+        console.error('Error saving settings:', e);
+    }
+</script>
+"""
+
+def save_settings_to_browser(project_id, file_path, branch, selected_links):
+    """Save non-sensitive settings to localStorage (the GitLab token is never included)"""
+    settings = {
+        "project_id": project_id,
+        "file_path": file_path,
+        "branch": branch,
+        "selected_links": selected_links
+    }
+    # Escape "</" so values can't close the surrounding script tag
+    settings_json = json.dumps(settings).replace("</", "<\\/")
+    components.html(_SAVE_SETTINGS_JS.replace("__SETTINGS_JSON__", settings_json), height=0)
+
 def clear_settings():
     """Clear all saved settings"""
     if os.path.exists(SETTINGS_FILE):
@@ -89,103 +169,116 @@ def clear_settings():
             return False
     return True  # Return True if file doesn't exist (nothing to clear)
 
-# Initialize session state variables
+# Initialize session state variables, reading saved settings only on the first run
 if 'settings_loaded' not in st.session_state:
     settings = load_settings()
-    st.session_state.gitlab_token = ""  # Initialize with empty string for security
-    st.session_state.project_id = settings.get("project_id", "67327904")
-    st.session_state.file_path = settings.get("file_path", "symplaC4.json")
-    st.session_state.branch = settings.get("branch", "main")
-    st.session_state.selected_links = settings.get("selected_links", ["repository", "logs", "APM", "openAPI", "monitor", "dashboard"])
+    for key, default in _DEFAULT_SETTINGS.items():
+        st.session_state[key] = settings.get(key, copy.copy(default))
     st.session_state.settings_loaded = True
 
-# Initialize other session state variables if they don't exist
-if 'gitlab_token' not in st.session_state:
-    st.session_state.gitlab_token = ""
-
-if 'selected_links' not in st.session_state:
-    st.session_state.selected_links = ["repository", "logs", "APM", "openAPI", "monitor", "dashboard"]
+for key, default in _SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, copy.copy(default))
 
-if 'mapped_elements' not in st.session_state:
-    st.session_state.mapped_elements = []
-
-if 'c4_data' not in st.session_state:
-    st.session_state.c4_data = None
-
-if 'csv_data' not in st.session_state:
-    st.session_state.csv_data = None
-
-if 'critical_repos' not in st.session_state:
-    st.session_state.critical_repos = []
-
-# Add JavaScript to load settings from localStorage on page load
-components.html(
-    """
-    <script>
-    function loadSettings() {
-        const savedSettings = localStorage.getItem('c4_analytics_settings');
-        if (savedSettings) {
-            try {
-                const settings = JSON.parse(savedSettings);
-                console.log('Found saved settings:', settings);
+# Add JavaScript to load settings from localStorage on page load (once per session,
+# since it may reload the page and every injection costs a full script rerun)
+if not st.session_state.get('_ls_bootstrapped'):
+    components.html(
+        """
+        <script>
+        function loadSettings() {
+            const savedSettings = localStorage.getItem('c4_analytics_settings');
+            if (savedSettings) {
+                try {
+                    const settings = JSON.parse(savedSettings);
+                    console.log('Found saved settings:', settings);
                 
-                // Update session state via query parameters
-                const params = new URLSearchParams(window.location.search);
-                let needsReload = false;
+                    // Update session state via query parameters
+                    const params = new URLSearchParams(window.location.search);
+                    let needsReload = false;
                 
-                if (settings.project_id && !params.has('project_id')) {
-                    params.set('project_id', settings.project_id);
-                    needsReload = true;
-                }
-                if (settings.file_path && !params.has('file_path')) {
-                    params.set('file_path', settings.file_path);
-                    needsReload = true;
-                }
-                if (settings.branch && !params.has('branch')) {
-                    params.set('branch', settings.branch);
-                    needsReload = true;
-                }
-                if (settings.selected_links && !params.has('selected_links')) {
-                    params.set('selected_links', JSON.stringify(settings.selected_links));
-                    needsReload = true;
-                }
+                    if (settings.project_id && !params.has('project_id')) {
+                        params.set('project_id', settings.project_id);
+                        needsReload = true;
+                    }
+                    if (settings.file_path && !params.has('file_path')) {
+                        params.set('file_path', settings.file_path);
+                        needsReload = true;
+                    }
+                    if (settings.branch && !params.has('branch')) {
+                        params.set('branch', settings.branch);
+                        needsReload = true;
+                    }
+                    if (settings.selected_links && !params.has('selected_links')) {
+                        params.set('selected_links', JSON.stringify(settings.selected_links));
+                        needsReload = true;
+                    }
                 
-                if (needsReload) {
-                    // Reload the page with the new query parameters
-                    window.location.search = params.toString();
+                    if (needsReload) {
+                        // Reload the page with the new query parameters
+                        window.location.search = params.toString();
+                    }
+                } catch (e) {
+                    console.error('Error loading settings from localStorage:', e);
                 }
-            } catch (e) {
-                console.error('Error loading settings from localStorage:', e);
             }
         }
-    }
     
-    // Run immediately and also when DOM is fully loaded
-    loadSettings();
-    if (document.readyState !== 'complete') {
-        window.addEventListener('load', loadSettings);
-    }
-    </script>
-    """,
-    height=0,
-)
+        // Run immediately and also when DOM is fully loaded
+        loadSettings();
+        if (document.readyState !== 'complete') {
+            window.addEventListener('load', loadSettings);
+        }
+        </script>
+        """,
+        height=0,
+    )
+    st.session_state._ls_bootstrapped = True
 
 # Read query parameters to initialize session state from localStorage
 # Using the new st.query_params API instead of the deprecated experimental version
+# Values already in session state are left untouched to avoid needless state churn
 if st.query_params:
-    if 'project_id' in st.query_params:
-        st.session_state.project_id = st.query_params['project_id']
-    if 'file_path' in st.query_params:
-        st.session_state.file_path = st.query_params['file_path']
-    if 'branch' in st.query_params:
-        st.session_state.branch = st.query_params['branch']
+    for param in ('project_id', 'file_path', 'branch'):
+        if param in st.query_params and st.session_state.get(param) != st.query_params[param]:
+            st.session_state[param] = st.query_params[param]
     if 'selected_links' in st.query_params:
         try:
-            st.session_state.selected_links = json.loads(st.query_params['selected_links'])
+            selected_links_param = json.loads(st.query_params['selected_links'])
+            if st.session_state.get('selected_links') != selected_links_param:
+                st.session_state.selected_links = selected_links_param
         except ValueError:
             pass  # Keep default if conversion fails
 
-# Function to fetch JSON data from GitLab
+# Shared HTTP session so repeated GitLab calls reuse keep-alive connections.
+# Cached as a resource so one connection pool is shared across reruns and sessions.
+@st.cache_resource
+def get_session():
+    session = requests.Session()
+    session.headers.update({'Accept-Encoding': 'gzip'})
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+    ))
+    return session
+
+# Cached GitLab API fetch. The token is passed unhashed (leading underscore) and
+# the cache is keyed on its hash instead, so secrets never end up in cache keys.
+@st.cache_data(ttl=600, show_spinner=False)
+def _fetch_gitlab_json_cached(project_id, file_path, branch, token_hash, _token=None):
+    # URL encode the file path
+    encoded_file_path = requests.utils.quote(file_path, safe='')
+    api_url = f"https://gitlab.com/api/v4/projects/{project_id}/repository/files/{encoded_file_path}/raw?ref={branch}"
+
+    headers = {}
+    if _token:
+        headers['PRIVATE-TOKEN'] = _token
+
+    response = get_session().get(api_url, headers=headers, timeout=(5, 30))
+    response.raise_for_status()
+    return response.content
+
+# Function to fetch the raw JSON document from GitLab
 def fetch_gitlab_json(url=None, token=None, project_id=None, file_path=None, branch=None):
     # If direct URL is provided, use it
     if url:
@@ -196,9 +289,9 @@ def fetch_gitlab_json(url=None, token=None, project_id=None, file_path=None, bra
             st.warning("No GitLab token provided. You may encounter authentication issues when accessing private repositories.")
         
         try:
-            response = requests.get(url, headers=headers)
+            response = get_session().get(url, headers=headers, timeout=(5, 30))
             response.raise_for_status()
-            return response.json()
+            return response.content
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 403:
                 st.error("Authentication error: You need a valid GitLab token to access this resource. Please provide a valid token in the sidebar.")
@@ -213,20 +306,12 @@ def fetch_gitlab_json(url=None, token=None, project_id=None, file_path=None, bra
     elif project_id and file_path:
         branch = branch or "main"  # Default to main branch if not specified
         
-        # URL encode the file path
-        encoded_file_path = requests.utils.quote(file_path, safe='')
-        api_url = f"https://gitlab.com/api/v4/projects/{project_id}/repository/files/{encoded_file_path}/raw?ref={branch}"
-        
-        headers = {}
-        if token:
-            headers['PRIVATE-TOKEN'] = token
-        else:
+        if not token:
             st.warning("No GitLab token provided. You may encounter authentication issues when accessing private repositories.")
+        token_hash = hashlib.sha256(token.encode()).hexdigest() if token else ""
         
         try:
-            response = requests.get(api_url, headers=headers)
-            response.raise_for_status()
-            return response.json()
+            return _fetch_gitlab_json_cached(project_id, file_path, branch, token_hash, _token=token)
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 403:
                 st.error("Authentication error: You need a valid GitLab token to access this resource. Please provide a valid token in the sidebar.")
@@ -241,39 +326,94 @@ def fetch_gitlab_json(url=None, token=None, project_id=None, file_path=None, bra
         st.error("Either direct URL or project ID and file path must be provided.")
         return None
 
-# Function to extract elements of specific kinds from C4 data
-def extract_elements(c4_data, target_kinds):
+# Function to extract elements of specific kinds from the raw C4 JSON document.
+# Takes bytes rather than the parsed dict so the cache key is a cheap content hash.
+@st.cache_data(max_entries=4, show_spinner=False)
+def extract_elements(c4_data_bytes, target_kinds):
+    c4_data = orjson.loads(c4_data_bytes)
     elements = []
     
-    # Check if the JSON structure has elements at the top level
+    # Elements live at the top level, or alternatively under specification
+    source = {}
     if c4_data and 'elements' in c4_data:
-        for element_id, element_data in c4_data['elements'].items():
-            # Check if the element has the kind we're looking for
-            if 'kind' in element_data and element_data['kind'] in target_kinds:
-                # Add element ID to the data for reference
-                element_data['id'] = element_id
-                elements.append(element_data)
-    # Also check the alternative structure (elements under specification)
+        source = c4_data['elements']
     elif c4_data and 'specification' in c4_data and 'elements' in c4_data['specification']:
-        for element_id, element_data in c4_data['specification']['elements'].items():
-            # Check if the element has the kind we're looking for
-            if 'kind' in element_data and element_data['kind'] in target_kinds:
-                # Add element ID to the data for reference
-                element_data['id'] = element_id
-                elements.append(element_data)
+        source = c4_data['specification']['elements']
+    
+    for element_id, element_data in source.items():
+        # Check if the element has the kind we're looking for
+        if element_data.get('kind') in target_kinds:
+            # Copy with the element ID for reference, leaving the parsed JSON untouched
+            elements.append({**element_data, 'id': element_id})
     
     return elements
 
-# Function to check if an element has specific links
-def check_element_links(element, link_types):
-    result = {link_type: False for link_type in link_types}
+# Function to summarize the structure of an uploaded C4 JSON document for debugging
+@st.cache_data(max_entries=4, show_spinner=False)
+def describe_c4_structure(c4_data_bytes):
+    c4_data = orjson.loads(c4_data_bytes)
     
-    if 'links' in element and element['links']:
-        for link in element['links']:
-            if 'title' in link and link['title'] in link_types:
-                result[link['title']] = True
+    if 'elements' in c4_data:
+        sample_elements = dict(list(c4_data['elements'].items())[:3])
+    elif 'specification' in c4_data and 'elements' in c4_data['specification']:
+        sample_elements = dict(list(c4_data['specification']['elements'].items())[:3])
+    else:
+        sample_elements = None
     
-    return result
+    return {
+        "debug": {
+            "Top level keys": list(c4_data.keys()),
+            "Has 'elements' key": 'elements' in c4_data,
+            "Has 'specification' key": 'specification' in c4_data,
+            "Has 'specification.elements'": 'specification' in c4_data and 'elements' in c4_data.get('specification', {})
+        },
+        "sample_elements": sample_elements,
+        "top_level_types": {k: type(v).__name__ for k, v in c4_data.items()}
+    }
+
+# Function to build a column-oriented Arrow table of the element fields shown in the grid
+def build_elements_table(elements):
+    ids, kinds, titles, technologies, descriptions = [], [], [], [], []
+    for element in elements:
+        ids.append(element.get('id', ''))
+        kinds.append(element.get('kind', ''))
+        titles.append(element.get('title', ''))
+        technologies.append(element.get('technology', ''))
+        descriptions.append(element.get('description', ''))
+    
+    return pa.table({
+        'id': pa.array(ids, type=pa.string()),
+        'kind': pa.array(kinds, type=pa.string()),
+        'title': pa.array(titles, type=pa.string()),
+        'technology': pa.array(technologies, type=pa.string()),
+        'description': pa.array(descriptions, type=pa.string())
+    })
+
+# Function to build a link checker specialized for a fixed set of link types, so loops
+# over many elements build the lookup template once instead of once per element
+def make_link_checker(link_types):
+    template = dict.fromkeys(link_types, False)
+    
+    def check_links(element):
+        result = template.copy()
+        for link in element.get('links') or ():
+            # Dict membership is a hash lookup, whatever the type of link_types
+            title = link.get('title')
+            if title in result:
+                result[title] = True
+        return result
+    
+    return check_links
+
+# Function to pack each element's links into a uint8 bitmask over LINK_BITS
+def build_link_presence(elements):
+    def element_bits(element):
+        bits = 0
+        for link in element.get('links') or ():
+            bits |= LINK_BITS.get(link.get('title'), 0)
+        return bits
+    
+    return np.fromiter((element_bits(element) for element in elements), dtype=np.uint8, count=len(elements))
 
 # Function to extract repository URL from element links
 def get_repository_url(element):
@@ -283,48 +423,185 @@ def get_repository_url(element):
                 return link['url']
     return None
 
-# Function to match repository URLs between C4 elements and CSV data
+# Function to find the (case-insensitive) URL column among CSV columns
+def find_url_column(columns):
+    for column in columns:
+        if column.lower() == 'url':
+            return column
+    return None
+
+# Function to load the repositories CSV, reading only the URL column when present
+# Cached on the file contents so reruns with the same upload skip parsing entirely
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_repositories_csv(csv_bytes):
+    csv_file = io.BytesIO(csv_bytes)
+    
+    # Peek at the header to detect the URL column name, then rewind for the real read
+    header = pd.read_csv(csv_file, nrows=0)
+    csv_file.seek(0)
+    
+    url_column = find_url_column(header.columns)
+    if url_column is None:
+        # Load everything so the missing-column warning can be shown downstream
+        return pd.read_csv(csv_file)
+    
+    csv_data = pd.read_csv(csv_file, engine='pyarrow', usecols=[url_column])
+    
+    # Normalize once per upload so matching doesn't redo it on every rerun
+    csv_data[NORMALIZED_URL_COLUMN] = normalize_url_series(csv_data[url_column])
+    return csv_data
+
+# Function to normalize repository URLs (lowercase host + path) for comparison
+def normalize_url_series(urls):
+    host_and_path = urls.astype(str).str.extract(_URL_RE, expand=False).fillna('')
+    return host_and_path.str.rstrip('/').str.lower()
+
+# Function to index C4 elements by normalized repository URL (last element wins on duplicates)
+def build_element_url_index(elements):
+    element_repos = [(get_repository_url(element), element) for element in elements]
+    element_repos = [(repo_url, element) for repo_url, element in element_repos if repo_url]
+    if not element_repos:
+        return {}
+    
+    repo_urls, repo_elements = zip(*element_repos)
+    normalized_urls = normalize_url_series(pd.Series(repo_urls))
+    return dict(zip(normalized_urls, repo_elements))
+
+# Function to match repository URLs between C4 elements and CSV data. Not st.cache_data:
+# hashing the element dicts costs more than the match, and reruns reuse it via match_inputs_key.
 def match_repositories(elements, csv_data):
     if csv_data is None or elements is None:
         return []
     
     # Make column names case-insensitive by finding the URL column
-    url_column = None
-    for column in csv_data.columns:
-        if column.lower() == 'url':
-            url_column = column
-            break
+    url_column = find_url_column(csv_data.columns)
     
     # If no URL column found, show a warning
     if url_column is None:
         st.warning("No 'url' column found in CSV. Please ensure your CSV has a column named 'url', 'URL', or similar.")
         return []
     
-    # Extract repository URLs from elements
-    element_repos = {}
-    for element in elements:
-        repo_url = get_repository_url(element)
-        if repo_url:
-            # Normalize URL for comparison
-            parsed_url = urlparse(repo_url)
-            normalized_url = f"{parsed_url.netloc}{parsed_url.path}".rstrip('/').lower()  # Convert to lowercase
-            element_repos[normalized_url] = element
+    # Look up elements by normalized repository URL
+    elem_by_url = build_element_url_index(elements)
+    if not elem_by_url:
+        return []
     
-    # Match with CSV repositories
-    matches = []
-    for _, row in csv_data.iterrows():
-        if url_column in row and row[url_column]:
-            # Normalize URL for comparison
-            parsed_url = urlparse(str(row[url_column]))
-            normalized_url = f"{parsed_url.netloc}{parsed_url.path}".rstrip('/').lower()  # Convert to lowercase
-            
-            if normalized_url in element_repos:
-                matches.append({
-                    'csv_repo': row,
-                    'c4_element': element_repos[normalized_url]
-                })
+    elements_df = pd.DataFrame({
+        '_c4_norm': list(elem_by_url.keys()),
+        '_c4_element': list(elem_by_url.values())
+    })
     
-    return matches
+    # Match with CSV repositories on the normalized URL (precomputed at upload when available)
+    csv_columns = [column for column in csv_data.columns if column != NORMALIZED_URL_COLUMN]
+    if NORMALIZED_URL_COLUMN not in csv_data.columns:
+        csv_data = csv_data.assign(**{NORMALIZED_URL_COLUMN: normalize_url_series(csv_data[url_column])})
+    merged = csv_data.merge(elements_df, left_on=NORMALIZED_URL_COLUMN, right_on='_c4_norm', how='inner')
+    
+    csv_rows = merged[csv_columns].to_dict('records')
+    return [
+        {'csv_repo': csv_row, 'c4_element': element}
+        for csv_row, element in zip(csv_rows, merged['_c4_element'])
+    ]
+
+# Function to fingerprint the inputs of match_repositories, cheaper than Streamlit's argument hashing
+def match_inputs_key(c4_json, elements, csv_data):
+    if c4_json is None or elements is None or csv_data is None:
+        return None
+    c4_digest = hashlib.blake2b(c4_json, digest_size=16).hexdigest()
+    csv_digest = int(pd.util.hash_pandas_object(csv_data, index=False).sum())
+    return (c4_digest, len(elements), csv_digest, len(csv_data))
+
+# Function to build the progress table of the critical repositories. Cached on a content
+# fingerprint of the inputs (see match_inputs_key), so filter reruns reuse the result; the
+# matches and CSV rows themselves are not hashed.
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_progress_df(inputs_key, selected_links, _matches, _all_repos):
+    matches = _matches
+    all_repos = _all_repos
+    
+    # Find the URL column first (the CSV header may be 'url', 'URL', ...)
+    url_column = find_url_column(all_repos.columns)
+    
+    # Calculate progress for matched repositories in columnar form
+    selected_links = list(selected_links)
+    total_selected = len(selected_links)
+    check_selected_links = make_link_checker(selected_links)
+
+    matched_elements = [match['c4_element'] for match in matches]
+    matched_urls = [match['csv_repo'].get(url_column, '') for match in matches]
+    matched_repo_urls = set(matched_urls)
+
+    # Boolean matrix of (matched elements x selected links)
+    link_matrix = pd.DataFrame(
+        [check_selected_links(element) for element in matched_elements],
+        columns=selected_links,
+        dtype=bool
+    )
+
+    # Count monitoring as monitor when both are selected
+    if 'monitor' in link_matrix.columns and 'monitoring' in link_matrix.columns:
+        link_matrix['monitor'] |= link_matrix['monitoring']
+
+    # Count links that are present and calculate progress percentage
+    present_links = link_matrix.sum(axis=1).to_numpy()
+    if total_selected > 0:
+        progress_pct = present_links / total_selected * 100
+    else:
+        progress_pct = np.zeros(len(present_links))
+
+    progress_df = pd.DataFrame({
+        'Repository': matched_urls,
+        'Element': [element.get('title', '') for element in matched_elements],
+        'Links': [f"{present}/{total_selected}" for present in present_links],
+        'Present': present_links.astype(np.int64),
+        'Progress': progress_pct,
+        'Progress %': [f"{pct:.1f}%" for pct in progress_pct],
+        'Status': np.where(present_links == total_selected, 'Complete', 'Incomplete')
+    })
+
+    if url_column:
+        # Add unmatched repositories with 0 progress
+        urls = all_repos[url_column]
+        unmatched_urls = urls[urls.notna() & urls.ne('') & ~urls.isin(matched_repo_urls)]
+        if not unmatched_urls.empty:
+            unmatched_df = pd.DataFrame({
+                'Repository': unmatched_urls.to_numpy(),
+                'Element': 'Not mapped in C4',
+                'Links': '0/0',
+                'Present': 0,
+                'Progress': 0.0,
+                'Progress %': "0.0%",
+                'Status': 'Not mapped'
+            })
+            progress_df = pd.concat([progress_df, unmatched_df], ignore_index=True)
+    else:
+        st.warning("No 'url' column found in CSV. Cannot identify unmatched repositories.")
+    
+    # Sort by progress (descending) once here; filtering keeps this order, so reruns don't re-sort
+    progress_df = progress_df.sort_values('Progress', ascending=False, kind='stable').reset_index(drop=True)
+    
+    # Status has three known values; a categorical compares and groups on integer codes
+    progress_df['Status'] = pd.Categorical(progress_df['Status'], categories=STATUS_CATEGORIES)
+    
+    # Lowercased copies for the search boxes, so each keystroke doesn't re-casefold every row
+    progress_df['_repository_search'] = progress_df['Repository'].astype(str).str.lower()
+    progress_df['_element_search'] = progress_df['Element'].astype(str).str.lower()
+    
+    return progress_df
+
+# Function to display a DataFrame one page at a time, so large tables don't ship every row to the browser
+def display_dataframe_page(df, page_key, page_size=DATAFRAME_PAGE_SIZE, **dataframe_kwargs):
+    if len(df) <= page_size:
+        st.dataframe(df, **dataframe_kwargs)
+        return
+    
+    page_count = (len(df) + page_size - 1) // page_size
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key=page_key)
+    start = (page - 1) * page_size
+    end = min(start + page_size, len(df))
+    
+    st.dataframe(df.iloc[start:end], **dataframe_kwargs)
+    st.caption(f"Rows {start + 1}-{end} of {len(df)} (page {page} of {page_count})")
 
 # Sidebar for setup
 with st.sidebar:
@@ -367,19 +644,37 @@ with st.sidebar:
                 help="Branch name (defaults to 'main')"
             )
             
-            # Fetch data button
-            if st.button("Fetch Data from GitLab API"):
+            # Fetch data buttons (refresh bypasses the cached response)
+            fetch_col, refresh_col = st.columns([3, 1])
+            with fetch_col:
+                fetch_clicked = st.button("Fetch Data from GitLab API", use_container_width=True)
+            with refresh_col:
+                refresh_clicked = st.button("🔄 Refresh", use_container_width=True, help="Clear the cached GitLab response and fetch again")
+            
+            if refresh_clicked:
+                _fetch_gitlab_json_cached.clear()
+            
+            if fetch_clicked or refresh_clicked:
                 with st.spinner("Fetching C4 data..."):
-                    c4_data = fetch_gitlab_json(
+                    c4_json = fetch_gitlab_json(
                         token=gitlab_token,  # Use the current value, not session_state
                         project_id=project_id,
                         file_path=file_path,
                         branch=branch
                     )
-                    if c4_data:
-                        st.session_state.c4_data = c4_data
-                        target_kinds = ['container', 'application', 'service', 'webapp', 'mobile', 'symfony-app']
-                        st.session_state.mapped_elements = extract_elements(c4_data, target_kinds)
+                    mapped_elements = None
+                    if c4_json:
+                        try:
+                            mapped_elements = extract_elements(c4_json, _GITLAB_TARGET_KINDS)
+                        except Exception as e:
+                            st.error(f"Error parsing JSON data: {str(e)}")
+                    if mapped_elements is not None:
+                        st.session_state.c4_json = c4_json
+                        st.session_state.mapped_elements = mapped_elements
+                        st.session_state.elements_table = build_elements_table(st.session_state.mapped_elements)
+                        st.session_state.link_presence = build_link_presence(st.session_state.mapped_elements)
+                        # Elements now come from GitLab, so a later upload must be loaded again
+                        st.session_state.pop('_uploaded_json_digest', None)
                         st.success(f"Successfully fetched {len(st.session_state.mapped_elements)} elements!")
                         
                         # Save settings when successfully fetching data
@@ -388,42 +683,29 @@ with st.sidebar:
                         st.session_state.file_path = file_path
                         st.session_state.branch = branch
                         
-                        # Save to localStorage
-                        save_settings_js = f"""
-                        <script>
-                            const settings = {{
-                                gitlab_token: "{gitlab_token}",
-                                project_id: "{project_id}",
-                                file_path: "{file_path}",
-                                branch: "{branch}",
-                                selected_links: {json.dumps(st.session_state.selected_links)}
-                            }};
-                            localStorage.setItem('c4_analytics_settings', JSON.stringify(settings));
-                            console.log('Settings saved automatically after successful fetch');
-                        </script>
-                        """
-                        st.components.v1.html(save_settings_js, height=0)
+                        # Save non-sensitive settings to localStorage
+                        save_settings_to_browser(project_id, file_path, branch, st.session_state.selected_links)
                     else:
                         st.error("Failed to fetch C4 data.")
         else:
             uploaded_json = st.file_uploader("Upload JSON File", type=["json"])
             if uploaded_json is not None:
-                # Read and parse the uploaded JSON file
+                # Read and parse the uploaded JSON file once per upload; reruns with the same
+                # file reuse the elements and column tables already in the session state
                 try:
-                    json_content = uploaded_json.read()
-                    c4_data = json.loads(json_content)
-                    st.session_state.c4_data = c4_data
+                    json_content = uploaded_json.getvalue()
+                    json_digest = hashlib.blake2b(json_content, digest_size=16).hexdigest()
+                    if json_digest != st.session_state.get('_uploaded_json_digest'):
+                        st.session_state.c4_json = json_content
+                        st.session_state._uploaded_c4_structure = describe_c4_structure(json_content)
+                        st.session_state.mapped_elements = extract_elements(json_content, _TARGET_KINDS)
+                        st.session_state.elements_table = build_elements_table(st.session_state.mapped_elements)
+                        st.session_state.link_presence = build_link_presence(st.session_state.mapped_elements)
+                        st.session_state._uploaded_json_digest = json_digest
+                    c4_structure = st.session_state._uploaded_c4_structure
                     
                     # Add debugging information
-                    st.expander("JSON Structure Debug").write({
-                        "Top level keys": list(c4_data.keys()),
-                        "Has 'elements' key": 'elements' in c4_data,
-                        "Has 'specification' key": 'specification' in c4_data,
-                        "Has 'specification.elements'": 'specification' in c4_data and 'elements' in c4_data.get('specification', {})
-                    })
-                    
-                    target_kinds = ['container', 'application', 'service', 'webapp', 'mobile']
-                    st.session_state.mapped_elements = extract_elements(c4_data, target_kinds)
+                    st.expander("JSON Structure Debug").write(c4_structure["debug"])
                     
                     if len(st.session_state.mapped_elements) > 0:
                         st.success(f"Successfully loaded {len(st.session_state.mapped_elements)} elements!")
@@ -431,15 +713,11 @@ with st.sidebar:
                         st.warning("No elements of the target kinds were found in the JSON file.")
                         # Show sample of the data structure to help debug
                         with st.expander("JSON Data Sample"):
-                            if 'elements' in c4_data:
-                                sample_elements = list(c4_data['elements'].items())[:3]
-                                st.json(dict(sample_elements))
-                            elif 'specification' in c4_data and 'elements' in c4_data['specification']:
-                                sample_elements = list(c4_data['specification']['elements'].items())[:3]
-                                st.json(dict(sample_elements))
+                            if c4_structure["sample_elements"] is not None:
+                                st.json(c4_structure["sample_elements"])
                             else:
                                 st.write("Could not find elements in the expected structure.")
-                                st.json({k: type(v).__name__ for k, v in c4_data.items()})
+                                st.json(c4_structure["top_level_types"])
                 except Exception as e:
                     st.error(f"Error parsing JSON file: {str(e)}")
     
@@ -463,7 +741,7 @@ with st.sidebar:
         # Process CSV if uploaded
         if csv_file is not None:
             try:
-                csv_data = pd.read_csv(csv_file)
+                csv_data = load_repositories_csv(csv_file.getvalue())
                 st.session_state.csv_data = csv_data
                 st.sidebar.success(f"CSV loaded with {len(csv_data)} repositories!")
             except Exception as e:
@@ -473,13 +751,10 @@ with st.sidebar:
         # Progress Settings
         st.header("Progress Settings")
         
-        # Define all possible link types
-        all_link_types = ["repository", "logs", "APM", "openAPI", "monitor", "monitoring", "dashboard", "backstage"]
-        
         # Let user select which links to include in progress calculation
         selected_links = st.multiselect(
             "Select links to evaluate for progress:",
-            options=all_link_types,
+            options=LINK_TYPES,
             default=st.session_state.selected_links,
             help="Progress will be calculated based on the presence of these links"
         )
@@ -518,23 +793,7 @@ with st.sidebar:
                 selected_links=selected_links
             ):
                 # Save non-sensitive settings to localStorage
-                settings_js = f"""
-                <script>
-                    try {{
-                        const settings = {{
-                            project_id: "{project_id}",
-                            file_path: "{file_path}",
-                            branch: "{branch}",
-                            selected_links: {json.dumps(selected_links)}
-                        }};
-                        localStorage.setItem('c4_analytics_settings', JSON.stringify(settings));
-                        console.log('Settings saved successfully');
-                    }} catch (e) {{
-                        console.error('Error saving settings:', e);
-                    }}
-                </script>
-                """
-                st.components.v1.html(settings_js, height=0)
+                save_settings_to_browser(project_id, file_path, branch, selected_links)
                 st.success("Settings saved successfully!")
             else:
                 st.error("Failed to save settings.")
@@ -545,16 +804,19 @@ with st.sidebar:
             if clear_settings():
                 # Reset session state to defaults
                 st.session_state.gitlab_token = ""
-                st.session_state.project_id = "67327904"
-                st.session_state.file_path = "symplaC4.json"
-                st.session_state.branch = "main"
-                st.session_state.selected_links = ["repository", "logs", "APM", "openAPI", "monitor", "dashboard"]
+                for key, default in _DEFAULT_SETTINGS.items():
+                    st.session_state[key] = copy.copy(default)
                 st.success("Settings cleared!")
                 # Force a rerun to update the UI
                 st.rerun()
             else:
                 st.error("Failed to clear settings.")
 
+    # Clear cached GitLab responses, parsed elements and repository matches
+    if st.sidebar.button("🧹 Clear Caches", use_container_width=True):
+        st.cache_data.clear()
+        st.success("Caches cleared!")
+
 # Main content area
 st.title("C4 Repository Analytics")
 st.markdown("""
@@ -567,15 +829,17 @@ The repository serves as the foundation for Sympla's architecture portal with th
 - **Diagram Export**: Ability to export diagrams to PNG, SVG, and other formats
 """)
 
-# Calculate days remaining for each milestone
-today = datetime.now().date()
-milestone1_date = datetime(2025, 3, 15).date()
-milestone2_date = datetime(2025, 5, 1).date()
-milestone3_date = datetime(2025, 6, 1).date()
+# Calculate days remaining for each milestone (keyed on today's date, so it changes once a day)
+@st.cache_data(ttl=3600, show_spinner=False)
+def _milestone_days(today_iso):
+    today = date.fromisoformat(today_iso)
+    return (
+        (date(2025, 3, 15) - today).days,
+        (date(2025, 5, 1) - today).days,
+        (date(2025, 6, 1) - today).days
+    )
 
-days_to_milestone1 = (milestone1_date - today).days
-days_to_milestone2 = (milestone2_date - today).days
-days_to_milestone3 = (milestone3_date - today).days
+days_to_milestone1, days_to_milestone2, days_to_milestone3 = _milestone_days(datetime.now().date().isoformat())
 
 # Create milestone progress section
 st.subheader("Implementation Milestones")
@@ -611,6 +875,15 @@ with col3:
 if st.session_state.mapped_elements:
     st.header(f"Mapped C4 Elements ({len(st.session_state.mapped_elements)})")
     
+    # Column tables are built once per C4 load; rebuild only if the session state is stale
+    elements = st.session_state.mapped_elements
+    elements_table = st.session_state.elements_table
+    if elements_table is None or elements_table.num_rows != len(elements):
+        elements_table = st.session_state.elements_table = build_elements_table(elements)
+    link_presence = st.session_state.link_presence
+    if link_presence is None or len(link_presence) != len(elements):
+        link_presence = st.session_state.link_presence = build_link_presence(elements)
+    
     # Create filter controls in expandable section
     with st.expander("Filter C4 Elements", expanded=False):
         # Create two columns for filters
@@ -618,7 +891,7 @@ if st.session_state.mapped_elements:
         
         with filter_col1:
             # Filter by element kind
-            kinds = sorted(set(element.get('kind', '') for element in st.session_state.mapped_elements))
+            kinds = sorted(pc.unique(elements_table['kind']).to_pylist())
             selected_kinds = st.multiselect(
                 "Filter by Kind",
                 options=kinds,
@@ -626,8 +899,7 @@ if st.session_state.mapped_elements:
             )
             
             # Filter by technology
-            technologies = sorted(set(element.get('technology', '') for element in st.session_state.mapped_elements 
-                                if element.get('technology')))
+            technologies = sorted(technology for technology in pc.unique(elements_table['technology']).to_pylist() if technology)
             selected_technologies = st.multiselect(
                 "Filter by Technology",
                 options=technologies,
@@ -636,476 +908,362 @@ if st.session_state.mapped_elements:
         
         with filter_col2:
             # Filter by link presence
-            link_types = ['repository', 'logs', 'APM', 'openAPI', 'monitor', 'dashboard', 'backstage']
             link_filter_options = ["Any", "Has Link", "Missing Link"]
             link_filters = {}
             
-            for link_type in link_types:
+            for link_type in GRID_LINK_TYPES:
                 link_filters[link_type] = st.selectbox(
                     f"Filter by {link_type}",
                     options=link_filter_options,
                     index=0  # Default to "Any"
                 )
     
-    # Prepare data for the grid
-    grid_data = []
-    link_types = ['repository', 'logs', 'APM', 'openAPI', 'monitor', 'monitoring', 'dashboard', 'backstage']
+    # Apply kind and technology filters as Arrow compute expressions
+    mask = pc.is_in(elements_table['kind'], value_set=pa.array(selected_kinds, type=pa.string()))
+    if selected_technologies:
+        mask = pc.and_(mask, pc.is_in(elements_table['technology'], value_set=pa.array(selected_technologies, type=pa.string())))
     
-    for element in st.session_state.mapped_elements:
-        # Apply kind filter
-        if element.get('kind', '') not in selected_kinds:
-            continue
-            
-        # Apply technology filter
-        if selected_technologies and element.get('technology', '') not in selected_technologies:
-            continue
-        
-        # Get basic element info
-        element_info = {
-            'kind': element.get('kind', ''),
-            'title': element.get('title', ''),
-            'technology': element.get('technology', ''),
-            'description': element.get('description', '')
-        }
-        
-        # Check for links
-        link_info = check_element_links(element, link_types)
-        
-        # Apply link filters
-        skip_element = False
-        for link_type, filter_value in link_filters.items():
-            if link_type in link_info:
-                if filter_value == "Has Link" and not link_info[link_type]:
-                    skip_element = True
-                    break
-                elif filter_value == "Missing Link" and link_info[link_type]:
-                    skip_element = True
-                    break
-        
-        if skip_element:
-            continue
-            
-        # Combine all info
-        row_data = {**element_info, **link_info}
-        grid_data.append(row_data)
+    # Apply link filters as one required/forbidden bitmask test
+    required_bits = 0
+    forbidden_bits = 0
+    for link_type, filter_value in link_filters.items():
+        if filter_value == "Has Link":
+            required_bits |= LINK_BITS.get(link_type, 0)
+        elif filter_value == "Missing Link":
+            forbidden_bits |= LINK_BITS.get(link_type, 0)
     
-    # Convert to DataFrame for display
-    if grid_data:
-        df = pd.DataFrame(grid_data)
-        
-        # Replace monitoring with monitor if monitor is False and monitoring is True
-        if 'monitoring' in df.columns and 'monitor' in df.columns:
-            df['monitor'] = df.apply(lambda row: True if row['monitoring'] else row['monitor'], axis=1)
-            df = df.drop('monitoring', axis=1)
-        
-        # Reorder columns
-        column_order = ['kind', 'title', 'technology', 'description', 'repository', 
-                        'logs', 'APM', 'openAPI', 'monitor', 'dashboard', 'backstage']
-        df = df[[col for col in column_order if col in df.columns]]
-        
+    row_mask = mask.to_numpy(zero_copy_only=False)
+    row_mask &= (link_presence & required_bits) == required_bits
+    row_mask &= (link_presence & forbidden_bits) == 0
+    
+    # Build the visible grid as an Arrow table, unpacking the link bits into boolean columns.
+    # A "monitoring" link counts as "monitor".
+    visible_presence = link_presence[row_mask]
+    grid = elements_table.filter(pa.array(row_mask)).select(['kind', 'title', 'technology', 'description'])
+    for link_type in GRID_LINK_TYPES:
+        bits = LINK_BITS[link_type]
+        if link_type == 'monitor':
+            bits |= LINK_BITS['monitoring']
+        grid = grid.append_column(link_type, pa.array((visible_presence & bits) != 0, type=pa.bool_()))
+    
+    # Display the filtered grid
+    if grid.num_rows > 0:
         # Display the grid with count of filtered elements
-        st.subheader(f"Showing {len(df)} of {len(st.session_state.mapped_elements)} elements")
-        st.dataframe(df, use_container_width=True)
+        st.subheader(f"Showing {grid.num_rows} of {len(st.session_state.mapped_elements)} elements")
+        st.dataframe(grid, use_container_width=True)
     else:
         st.info("No elements match the selected filters.")
 
-# Critical repositories progress with filters
-if st.session_state.csv_data is not None and len(st.session_state.mapped_elements) > 0:
-    st.header("Critical Repositories Progress")
+# Function to render the filters, details table, charts and recommendations of the progress table.
+# As a fragment, filter interactions rerun only this part instead of the whole script.
+@st.fragment
+def render_progress(progress_df, selected_links):
+    # Add filters for repository progress
+    with st.expander("Filter Repositories", expanded=False):
+        # Create two columns for filters
+        repo_filter_col1, repo_filter_col2 = st.columns(2)
+        
+        with repo_filter_col1:
+            # Filter by status
+            status_options = ['All', 'Complete', 'Incomplete', 'Not mapped']
+            selected_status = st.selectbox(
+                "Filter by Status",
+                options=status_options,
+                index=0  # Default to "All"
+            )
+            
+            # Filter by progress range
+            min_progress, max_progress = st.slider(
+                "Progress Range (%)",
+                min_value=0,
+                max_value=100,
+                value=(0, 100)
+            )
+        
+        with repo_filter_col2:
+            # Search by repository URL
+            search_term = st.text_input(
+                "Search by Repository URL",
+                placeholder="Enter part of URL..."
+            )
+            
+            # Search by element name
+            element_search = st.text_input(
+                "Search by Element Name",
+                placeholder="Enter part of element name..."
+            )
     
-    # Match repositories
-    matches = match_repositories(st.session_state.mapped_elements, st.session_state.csv_data)
-    st.session_state.critical_repos = matches
+    # Apply filters to progress_df as one combined mask, indexing only once
+    mask = np.ones(len(progress_df), dtype=bool)
     
-    # Get all repositories from CSV
-    all_repos = st.session_state.csv_data
-    total_repos = len(all_repos)
+    # Status filter
+    if selected_status != 'All':
+        mask &= (progress_df['Status'] == selected_status).to_numpy()
     
-    if total_repos > 0:
-        # Calculate progress for matched repositories
-        progress_data = []
-        matched_repo_urls = set()
+    # Progress range filter (build_progress_df always emits a numeric Progress column)
+    progress_values = progress_df['Progress'].to_numpy()
+    mask &= (progress_values >= min_progress) & (progress_values <= max_progress)
+    
+    # Repository URL search (plain substring match)
+    if search_term:
+        mask &= progress_df['_repository_search'].str.contains(search_term.lower(), regex=False, na=False).to_numpy()
+    
+    # Element name search (plain substring match)
+    if element_search:
+        mask &= progress_df['_element_search'].str.contains(element_search.lower(), regex=False, na=False).to_numpy()
+    
+    # Reuse the frame as-is when no filter excludes anything
+    filtered_df = progress_df if mask.all() else progress_df.loc[mask]
+    
+    # Calculate overall progress based on ALL repositories in the progress table (every CSV row
+    # with a repository URL), so the totals agree with the details table and the charts
+    total_repos = len(progress_df)
+    status_counts = progress_df['Status'].value_counts()
+    complete_count = int(status_counts.get('Complete', 0))
+    incomplete_count = int(status_counts.get('Incomplete', 0))
+    not_mapped_count = int(status_counts.get('Not mapped', 0))
+    
+    overall_progress = (complete_count / total_repos) * 100 if total_repos > 0 else 0
+
+    # Display overall progress with percentage
+    st.subheader(f"Overall Progress: {complete_count}/{total_repos} repositories ({overall_progress:.1f}%)")
+    st.progress(overall_progress / 100)
+    
+    # Display progress for each repository
+    st.subheader(f"Repository Details (Showing {len(filtered_df)} of {len(progress_df)} repositories)")
+    
+    # Add visual indicators for status (a categorical maps its labels, not every row); the
+    # progress builder always emits these columns, so no defaults are needed
+    display_df = filtered_df.assign(
+        Status=filtered_df['Status'].map(STATUS_LABELS),
+        Progress_Numeric=filtered_df['Progress']
+    )
+    
+    display_dataframe_page(
+        display_df[['Repository', 'Element', 'Links', 'Progress_Numeric', 'Status']], 
+        page_key="repository_details_page",
+        use_container_width=True,
+        column_config={
+            "Repository": st.column_config.TextColumn("Repository URL", width="medium"),
+            "Element": st.column_config.TextColumn("C4 Element", width="medium"),
+            "Links": st.column_config.TextColumn("Links Count"),
+            "Progress_Numeric": st.column_config.ProgressColumn(
+                "Progress", 
+                min_value=0, 
+                max_value=100,
+                format="%.0f"  # Format is valid for ProgressColumn
+            ),
+            "Status": st.column_config.TextColumn("Status", width="small")
+        }
+    )
+
+    # Add visualization section (plotly is only imported when charts are rendered)
+    import plotly.graph_objects as go
+    st.header("Progress Visualization")
+
+    # Status counts were computed once above with value_counts
+    if not progress_df.empty:
+        # Create data for pie chart
+        labels = ['Complete', 'Incomplete', 'Not Mapped']
+        values = [complete_count, incomplete_count, not_mapped_count]
+        colors = ['#4CAF50', '#FFC107', '#F44336']  # Green, Amber, Red
         
-        for match in matches:
-            element = match['c4_element']
-            repo_url = get_repository_url(element)
-            csv_repo_url = match['csv_repo'].get('url', '')
-            matched_repo_urls.add(csv_repo_url)
-            
-            # Check links
-            link_info = check_element_links(element, st.session_state.selected_links)
-            
-            # Count true values (if monitoring is true, count it as monitor)
-            if 'monitoring' in link_info and link_info['monitoring'] and 'monitor' in st.session_state.selected_links:
-                link_info['monitor'] = True
-            
-            # Count links that are present
-            present_links = sum(1 for link_type, has_link in link_info.items() 
-                              if has_link and link_type in st.session_state.selected_links)
-            
-            # Total number of selected links
-            total_selected = len(st.session_state.selected_links)
+        # Create two columns for charts
+        chart_col1, chart_col2 = st.columns([3, 2])
+        
+        with chart_col1:
+            # Create pie chart
+            fig_pie = go.Figure(data=[go.Pie(
+                labels=labels,
+                values=values,
+                hole=.4,  # Donut chart
+                marker_colors=colors,
+                textinfo='label+percent',
+                insidetextorientation='radial'
+            )])
             
-            # Calculate progress percentage
-            progress_pct = (present_links / total_selected) * 100 if total_selected > 0 else 0
+            fig_pie.update_layout(
+                title_text="Repository Status Distribution",
+                showlegend=True,
+                legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
+                margin=dict(t=50, b=50, l=10, r=10),
+                height=400
+            )
             
-            # Add to progress data
-            progress_data.append({
-                'Repository': csv_repo_url,
-                'Element': element.get('title', ''),
-                'Links': f"{present_links}/{total_selected}",
-                'Progress': progress_pct,
-                'Progress %': f"{progress_pct:.1f}%",
-                'Status': 'Complete' if present_links == total_selected else 'Incomplete'
-            })
+            st.plotly_chart(fig_pie, use_container_width=True)
         
-        # Find the URL column first
-        url_column = None
-        for column in all_repos.columns:
-            if column.lower() == 'url':
-                url_column = column
-                break
-
-        if url_column:
-            # Add unmatched repositories with 0 progress
-            for _, repo_row in all_repos.iterrows():
-                repo_url = repo_row.get(url_column, '')
-                if repo_url and repo_url not in matched_repo_urls:
-                    progress_data.append({
-                        'Repository': repo_url,
-                        'Element': 'Not mapped in C4',
-                        'Links': '0/0',
-                        'Progress': 0,
-                        'Progress %': "0.0%",
-                        'Status': 'Not mapped'
-                    })
-        else:
-            st.warning("No 'url' column found in CSV. Cannot identify unmatched repositories.")
-        
-        # Convert to DataFrame
-        progress_df = pd.DataFrame(progress_data)
-        
-        # Add filters for repository progress
-        with st.expander("Filter Repositories", expanded=False):
-            # Create two columns for filters
-            repo_filter_col1, repo_filter_col2 = st.columns(2)
+        with chart_col2:
+            # Create bar chart showing progress by status
+            # (numpy per-category sums over the Status codes; reindex ensures all statuses are present)
+            status_codes = progress_df['Status'].cat.codes.to_numpy()
+            status_categories = progress_df['Status'].cat.categories
+            progress_sums = np.bincount(status_codes, weights=progress_df['Progress'].to_numpy(), minlength=len(status_categories))
+            status_sizes = np.bincount(status_codes, minlength=len(status_categories))
+            avg_progress = np.divide(progress_sums, status_sizes, out=np.zeros(len(status_categories)), where=status_sizes > 0)
+            status_progress = pd.Series(avg_progress, index=status_categories).reindex(labels, fill_value=0)
             
-            with repo_filter_col1:
-                # Filter by status
-                status_options = ['All', 'Complete', 'Incomplete', 'Not mapped']
-                selected_status = st.selectbox(
-                    "Filter by Status",
-                    options=status_options,
-                    index=0  # Default to "All"
-                )
-                
-                # Filter by progress range
-                min_progress, max_progress = st.slider(
-                    "Progress Range (%)",
-                    min_value=0,
-                    max_value=100,
-                    value=(0, 100)
-                )
+            # Create horizontal bar chart (a single trace colored per status)
+            fig_bar = go.Figure(go.Bar(
+                y=status_progress.index.tolist(),
+                x=status_progress.to_numpy(),
+                orientation='h',
+                marker_color=colors,
+                text=[f"{avg_progress:.1f}%" for avg_progress in status_progress],
+                textposition='auto'
+            ))
             
-            with repo_filter_col2:
-                # Search by repository URL
-                search_term = st.text_input(
-                    "Search by Repository URL",
-                    placeholder="Enter part of URL..."
-                )
-                
-                # Search by element name
-                element_search = st.text_input(
-                    "Search by Element Name",
-                    placeholder="Enter part of element name..."
-                )
-        
-        # Apply filters to progress_df
-        filtered_df = progress_df.copy()
-        
-        # Status filter
-        if selected_status != 'All':
-            filtered_df = filtered_df[filtered_df['Status'] == selected_status]
-        
-        # Progress range filter
-        if 'Progress' in filtered_df.columns:
-            filtered_df = filtered_df[(filtered_df['Progress'] >= min_progress) & 
-                                     (filtered_df['Progress'] <= max_progress)]
-        else:
-            # If 'Progress' column doesn't exist, try to find the correct column
-            # or create it from 'Progress %' if it exists
-            if 'Progress %' in filtered_df.columns:
-                # Extract numeric values from 'Progress %' column
-                filtered_df['Progress'] = filtered_df['Progress %'].str.rstrip('%').astype(float)
-            else:
-                # If neither column exists, add a default Progress column
-                st.warning("Progress column not found. Adding default values.")
-                filtered_df['Progress'] = 0.0
+            fig_bar.update_layout(
+                title_text="Average Progress by Status",
+                xaxis_title="Progress (%)",
+                yaxis=dict(
+                    title="Status",
+                    categoryorder='array',
+                    categoryarray=['Complete', 'Incomplete', 'Not Mapped']
+                ),
+                margin=dict(t=50, b=50, l=10, r=10),
+                height=400,
+                showlegend=False
+            )
+            
+            fig_bar.update_xaxes(range=[0, 100])
             
-            # Now apply the filter
-            filtered_df = filtered_df[(filtered_df['Progress'] >= min_progress) & 
-                                     (filtered_df['Progress'] <= max_progress)]
+            st.plotly_chart(fig_bar, use_container_width=True)
         
-        # Repository URL search
-        if search_term:
-            filtered_df = filtered_df[filtered_df['Repository'].str.contains(search_term, case=False, na=False)]
+        # Add a progress over time chart (simulated since we don't have historical data)
+        st.subheader("Repository Completion Progress")
         
-        # Element name search
-        if element_search:
-            filtered_df = filtered_df[filtered_df['Element'].str.contains(element_search, case=False, na=False)]
+        # Create a gauge chart to show overall completion
+        overall_progress = (complete_count / total_repos) * 100 if total_repos > 0 else 0
         
-        # Calculate overall progress based on ALL repositories in CSV
-        complete_repos = sum(1 for p in progress_data if p['Status'] == 'Complete')
-        incomplete_repos = sum(1 for p in progress_data if p['Status'] == 'Incomplete')
-        unmapped_repos = sum(1 for p in progress_data if p['Status'] == 'Not mapped')
+        fig_gauge = go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=overall_progress,
+            domain={'x': [0, 1], 'y': [0, 1]},
+            title={'text': "Overall Completion"},
+            gauge={
+                'axis': {'range': [0, 100]},
+                'bar': {'color': "#4CAF50"},
+                'steps': [
+                    {'range': [0, 33], 'color': "#FFCDD2"},
+                    {'range': [33, 66], 'color': "#FFE082"},
+                    {'range': [66, 100], 'color': "#C8E6C9"}
+                ],
+                'threshold': {
+                    'line': {'color': "red", 'width': 4},
+                    'thickness': 0.75,
+                    'value': 90
+                }
+            }
+        ))
         
-        overall_progress = (complete_repos / total_repos) * 100 if total_repos > 0 else 0
-
-        # Display overall progress with percentage
-        st.subheader(f"Overall Progress: {complete_repos}/{total_repos} repositories ({overall_progress:.1f}%)")
-        st.progress(overall_progress / 100)
+        fig_gauge.update_layout(
+            height=300,
+            margin=dict(t=50, b=0, l=25, r=25)
+        )
         
-        # Display progress for each repository
-        st.subheader(f"Repository Details (Showing {len(filtered_df)} of {len(progress_df)} repositories)")
+        st.plotly_chart(fig_gauge, use_container_width=True)
         
-        # Sort by progress (descending)
-        filtered_df = filtered_df.sort_values('Progress', ascending=False)
+        # Add a summary metrics row
+        st.subheader("Summary Metrics")
         
-        # Add visual indicators for status
-        def format_status(status):
-            if status == 'Complete':
-                return f"✅ {status}"
-            elif status == 'Incomplete':
-                return f"⚠️ {status}"
-            else:
-                return f"❌ {status}"
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
         
-        # Create a copy with formatted columns
-        display_df = filtered_df.copy()
-        if 'Status' in display_df.columns:
-            display_df['Status'] = display_df['Status'].apply(format_status)
-        else:
-            # If Status column doesn't exist, create it with a default value
-            st.warning("Status column not found in the data. Adding default values.")
-            display_df['Status'] = "❓ Unknown"
+        with metric_col1:
+            st.metric(
+                label="Total Repositories", 
+                value=total_repos
+            )
         
-        # Before displaying the dataframe, ensure all required columns exist
-        required_columns = ['Repository', 'Element', 'Links', 'Progress', 'Status']
-        for col in required_columns:
-            if col not in display_df.columns:
-                if col == 'Progress':
-                    display_df[col] = 0.0
-                elif col == 'Links':
-                    display_df[col] = "0/0"
-                elif col == 'Element':
-                    display_df[col] = "Unknown"
-                elif col == 'Status':
-                    display_df[col] = "❓ Unknown"
-                else:
-                    display_df[col] = ""
+        with metric_col2:
+            st.metric(
+                label="Complete", 
+                value=complete_count,
+                delta=f"{(complete_count/total_repos*100):.1f}%" if total_repos > 0 else "0%"
+            )
         
-        # Now create the Progress_Numeric column
-        display_df['Progress_Numeric'] = display_df['Progress']
+        with metric_col3:
+            st.metric(
+                label="Incomplete", 
+                value=incomplete_count,
+                delta=f"{(incomplete_count/total_repos*100):.1f}%" if total_repos > 0 else "0%",
+                delta_color="inverse"
+            )
         
-        st.dataframe(
-            display_df[['Repository', 'Element', 'Links', 'Progress_Numeric', 'Status']], 
-            use_container_width=True,
-            column_config={
-                "Repository": st.column_config.TextColumn("Repository URL", width="medium"),
-                "Element": st.column_config.TextColumn("C4 Element", width="medium"),
-                "Links": st.column_config.TextColumn("Links Count"),
-                "Progress_Numeric": st.column_config.ProgressColumn(
-                    "Progress", 
-                    min_value=0, 
-                    max_value=100,
-                    format="%.0f"  # Format is valid for ProgressColumn
-                ),
-                "Status": st.column_config.TextColumn("Status", width="small")
-            }
-        )
-
-        # Add visualization section
-        st.header("Progress Visualization")
-
-        # Calculate counts for each status
-        if 'progress_df' in locals() and not progress_df.empty:
-            complete_count = sum(1 for p in progress_data if p['Status'] == 'Complete')
-            incomplete_count = sum(1 for p in progress_data if p['Status'] == 'Incomplete')
-            not_mapped_count = sum(1 for p in progress_data if p['Status'] == 'Not mapped')
-            
-            # Create data for pie chart
-            labels = ['Complete', 'Incomplete', 'Not Mapped']
-            values = [complete_count, incomplete_count, not_mapped_count]
-            colors = ['#4CAF50', '#FFC107', '#F44336']  # Green, Amber, Red
-            
-            # Create two columns for charts
-            chart_col1, chart_col2 = st.columns([3, 2])
-            
-            with chart_col1:
-                # Create pie chart
-                fig_pie = go.Figure(data=[go.Pie(
-                    labels=labels,
-                    values=values,
-                    hole=.4,  # Donut chart
-                    marker_colors=colors,
-                    textinfo='label+percent',
-                    insidetextorientation='radial'
-                )])
-                
-                fig_pie.update_layout(
-                    title_text="Repository Status Distribution",
-                    showlegend=True,
-                    legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-                    margin=dict(t=50, b=50, l=10, r=10),
-                    height=400
-                )
-                
-                st.plotly_chart(fig_pie, use_container_width=True)
-            
-            with chart_col2:
-                # Create bar chart showing progress by status
-                status_progress = progress_df.groupby('Status')['Progress'].mean().reset_index()
-                
-                # Ensure all statuses are present
-                all_statuses = pd.DataFrame({'Status': labels})
-                status_progress = pd.merge(all_statuses, status_progress, on='Status', how='left').fillna(0)
-                
-                # Create horizontal bar chart
-                fig_bar = go.Figure()
-                
-                # Add bars
-                for i, (status, avg_progress) in enumerate(zip(status_progress['Status'], status_progress['Progress'])):
-                    fig_bar.add_trace(go.Bar(
-                        y=[status],
-                        x=[avg_progress],
-                        orientation='h',
-                        name=status,
-                        marker_color=colors[i],
-                        text=[f"{avg_progress:.1f}%"],
-                        textposition='auto'
-                    ))
-                
-                fig_bar.update_layout(
-                    title_text="Average Progress by Status",
-                    xaxis_title="Progress (%)",
-                    yaxis=dict(
-                        title="Status",
-                        categoryorder='array',
-                        categoryarray=['Complete', 'Incomplete', 'Not Mapped']
-                    ),
-                    margin=dict(t=50, b=50, l=10, r=10),
-                    height=400,
-                    showlegend=False
-                )
-                
-                fig_bar.update_xaxes(range=[0, 100])
-                
-                st.plotly_chart(fig_bar, use_container_width=True)
-            
-            # Add a progress over time chart (simulated since we don't have historical data)
-            st.subheader("Repository Completion Progress")
-            
-            # Create a gauge chart to show overall completion
-            overall_progress = (complete_count / total_repos) * 100 if total_repos > 0 else 0
-            
-            fig_gauge = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=overall_progress,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                title={'text': "Overall Completion"},
-                gauge={
-                    'axis': {'range': [0, 100]},
-                    'bar': {'color': "#4CAF50"},
-                    'steps': [
-                        {'range': [0, 33], 'color': "#FFCDD2"},
-                        {'range': [33, 66], 'color': "#FFE082"},
-                        {'range': [66, 100], 'color': "#C8E6C9"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': 90
-                    }
-                }
-            ))
-            
-            fig_gauge.update_layout(
-                height=300,
-                margin=dict(t=50, b=0, l=25, r=25)
+        with metric_col4:
+            st.metric(
+                label="Not Mapped", 
+                value=not_mapped_count,
+                delta=f"{(not_mapped_count/total_repos*100):.1f}%" if total_repos > 0 else "0%",
+                delta_color="inverse"
             )
+    else:
+        st.info("Upload a CSV file and fetch C4 data to see visualizations.")
+
+    # Add recommendations section
+    st.header("Recommendations")
+    
+    # Calculate which repositories need the most attention
+    if not progress_df.empty:
+        # Filter to incomplete repositories
+        incomplete_df = progress_df[progress_df['Status'] == 'Incomplete'].copy()
+        
+        if not incomplete_df.empty:
+            # Sort by progress (ascending)
+            incomplete_df = incomplete_df.sort_values('Progress')
             
-            st.plotly_chart(fig_gauge, use_container_width=True)
-            
-            # Add a summary metrics row
-            st.subheader("Summary Metrics")
-            
-            metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-            
-            with metric_col1:
-                st.metric(
-                    label="Total Repositories", 
-                    value=total_repos
-                )
+            # Get top 5 repositories that need attention
+            attention_needed = incomplete_df.head(5)
             
-            with metric_col2:
-                st.metric(
-                    label="Complete", 
-                    value=complete_count,
-                    delta=f"{(complete_count/total_repos*100):.1f}%" if total_repos > 0 else "0%"
-                )
-            
-            with metric_col3:
-                st.metric(
-                    label="Incomplete", 
-                    value=incomplete_count,
-                    delta=f"{(incomplete_count/total_repos*100):.1f}%" if total_repos > 0 else "0%",
-                    delta_color="inverse"
-                )
+            st.subheader("Repositories Needing Attention")
+            total_selected = len(selected_links)
+            for _, repo in attention_needed.iterrows():
+                st.markdown(f"""
+                **{repo['Element']}** ({repo['Progress']:.1f}% complete)
+                - Repository: {repo['Repository']}
+                - Current links: {repo['Links']} of {total_selected} selected
+                - Missing: {total_selected - repo['Present']} links
+                """)
+        
+        # Unmapped repositories
+        unmapped_df = progress_df[progress_df['Status'] == 'Not mapped']
+        if not unmapped_df.empty:
+            st.subheader("Unmapped Repositories")
+            st.markdown(f"**{len(unmapped_df)}** critical repositories are not mapped in the C4 diagrams:")
+            for _, repo in unmapped_df.head(5).iterrows():
+                st.markdown(f"- {repo['Repository']}")
             
-            with metric_col4:
-                st.metric(
-                    label="Not Mapped", 
-                    value=not_mapped_count,
-                    delta=f"{(not_mapped_count/total_repos*100):.1f}%" if total_repos > 0 else "0%",
-                    delta_color="inverse"
-                )
-        else:
-            st.info("Upload a CSV file and fetch C4 data to see visualizations.")
+            if len(unmapped_df) > 5:
+                st.markdown(f"... and {len(unmapped_df) - 5} more")
 
-        # Add recommendations section
-        st.header("Recommendations")
+# Critical repositories progress with filters
+if st.session_state.csv_data is not None and len(st.session_state.mapped_elements) > 0:
+    st.header("Critical Repositories Progress")
+    
+    # Match repositories, reusing the previous matches while the inputs are unchanged
+    match_key = match_inputs_key(st.session_state.c4_json, st.session_state.mapped_elements, st.session_state.csv_data)
+    if not FORCE_MATCH_RECOMPUTE and match_key is not None and match_key == st.session_state.get('_match_key'):
+        matches = st.session_state.critical_repos
+    else:
+        matches = match_repositories(st.session_state.mapped_elements, st.session_state.csv_data)
+        st.session_state.critical_repos = matches
+        st.session_state._match_key = match_key
+    
+    # Get all repositories from CSV
+    all_repos = st.session_state.csv_data
+    total_repos = len(all_repos)
+    
+    if total_repos > 0:
+        # Build the progress table (cached while the matched inputs and selected links are unchanged).
+        # Without a fingerprint, or when forcing a recompute, drop the cached tables first.
+        selected_links = tuple(st.session_state.selected_links)
+        if FORCE_MATCH_RECOMPUTE or match_key is None:
+            build_progress_df.clear()
+        progress_df = build_progress_df(match_key, selected_links, matches, all_repos)
         
-        # Calculate which repositories need the most attention
-        if not progress_df.empty:
-            # Filter to incomplete repositories
-            incomplete_df = progress_df[progress_df['Status'] == 'Incomplete'].copy()
-            
-            if not incomplete_df.empty:
-                # Sort by progress (ascending)
-                incomplete_df = incomplete_df.sort_values('Progress')
-                
-                # Get top 5 repositories that need attention
-                attention_needed = incomplete_df.head(5)
-                
-                st.subheader("Repositories Needing Attention")
-                for _, repo in attention_needed.iterrows():
-                    st.markdown(f"""
-                    **{repo['Element']}** ({repo['Progress']:.1f}% complete)
-                    - Repository: {repo['Repository']}
-                    - Current links: {repo['Links']} of {len(st.session_state.selected_links)} selected
-                    - Missing: {len(st.session_state.selected_links) - len(repo['Links'].split('/'))} links
-                    """)
-            
-            # Unmapped repositories
-            unmapped_df = progress_df[progress_df['Status'] == 'Not mapped']
-            if not unmapped_df.empty:
-                st.subheader("Unmapped Repositories")
-                st.markdown(f"**{len(unmapped_df)}** critical repositories are not mapped in the C4 diagrams:")
-                for _, repo in unmapped_df.head(5).iterrows():
-                    st.markdown(f"- {repo['Repository']}")
-                
-                if len(unmapped_df) > 5:
-                    st.markdown(f"... and {len(unmapped_df) - 5} more")
+        assert 'Progress' in progress_df.columns
+        
+        # Filters, table and charts rerun on their own when only a filter widget changes
+        render_progress(progress_df, selected_links)
     else:
         st.info("No repositories found in the CSV file.")
 else: